@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Recognise proxy patterns directly from EVM runtime bytecode (no network).
+
+Covers:
+- EIP-1167 minimal proxies (including short-PUSH vanity variants) and EIP-7511 (PUSH0)
+- 0age "more-minimal" proxies and the legacy Vyper `create_forwarder_to` stub
+- small DELEGATECALL stubs with a hard-coded target (PUSH20 / immutable PUSH32)
+- storage-slot proxies (EIP-1967, beacon, ZeppelinOS, EIP-1822) and EIP-897, as type
+  hints only: their target lives in storage and still needs an RPC read
+
+Usage:
+  python scripts/bytecode_proxy.py 0x363d3d373d3d3d363d73...
+"""
+
+import json
+import re
+import sys
+from typing import Optional
+
+OP_PUSH0 = 0x5F
+OP_PUSH1 = 0x60
+OP_PUSH4 = 0x63
+OP_PUSH20 = 0x73
+OP_PUSH32 = 0x7F
+OP_EQ = 0x14
+OP_SLOAD = 0x54
+OP_CALLCODE = 0xF2
+OP_DELEGATECALL = 0xF4
+
+# Stubs larger than this are treated as real contracts that happen to DELEGATECALL
+# (e.g. linked library calls), not as proxies.
+MAX_STUB_SIZE = 512
+
+# Anchored hex patterns for fixed-layout proxies; group "addr" is the PUSHn operand.
+FIXED_PATTERNS = [
+    ("eip1167", "EIP1167Proxy",
+     re.compile(r"^363d3d373d3d3d363d(?P<push>6[0-9a-f]|7[0-3])(?P<addr>[0-9a-f]+?)"
+                r"5af43d82803e903d9160[0-9a-f]{2}57fd5bf3$")),
+    ("eip7511", "EIP1167Proxy",
+     re.compile(r"^365f5f375f5f365f(?P<push>6[0-9a-f]|7[0-3])(?P<addr>[0-9a-f]+?)"
+                r"5af43d5f5f3e5f3d9160[0-9a-f]{2}57fd5bf3$")),
+    ("0age", "EIP1167Proxy",
+     re.compile(r"^3d3d3d3d363d3d37363d(?P<push>6[0-9a-f]|7[0-3])(?P<addr>[0-9a-f]+?)"
+                r"5af43d3d93803e60[0-9a-f]{2}57fd5bf3$")),
+    ("vyper-forwarder", "EIP1167Proxy",
+     re.compile(r"^366000600037611000600036600073(?P<addr>[0-9a-f]{40})"
+                r"5af4602c57600080fd5b6110006000f3$")),
+]
+
+# PUSH32 constants that identify storage-based proxy standards.
+SLOT_HINTS = {
+    "360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc": "EIP1967Proxy",
+    "a3f0ad74e5423aebfd80d3ef4346578335a9a72aeaee59ff6cb3582b35133d50": "EIP1967BeaconProxy",
+    "7050c9e0f4ca769c69bd3a8ef740bc37934f8e2c036e5a723fd8ee048ed3f8c3": "ZeppelinOSProxy",
+    "c5f16f0fcc639fa48a6947836d9850f504798523bf8c9a3a87d5876cf622bcf7": "PROXIABLEProxy",
+}
+# implementation() + proxyType() selectors together mark an EIP-897 proxy.
+EIP897_SELECTORS = {"5c60da1b", "4555d5c9"}
+
+
+def normalize_code(code_hex) -> str:
+    if not code_hex:
+        return ""
+    code = code_hex.lower()
+    return code[2:] if code.startswith("0x") else code
+
+
+def iter_opcodes(code: bytes):
+    """Yield `(pc, opcode, push_operand)`, skipping PUSH data so it is never read as code."""
+    pc = 0
+    n = len(code)
+    while pc < n:
+        op = code[pc]
+        if OP_PUSH1 <= op <= OP_PUSH32:
+            size = op - OP_PUSH1 + 1
+            yield pc, op, code[pc + 1:pc + 1 + size]
+            pc += 1 + size
+        else:
+            yield pc, op, b""
+            pc += 1
+
+
+def _address_from_operand(operand: bytes) -> Optional[str]:
+    if not operand or len(operand) > 32:
+        return None
+    value = int.from_bytes(operand, "big")
+    if value == 0 or value >= 1 << 160:
+        return None
+    return "0x" + format(value, "040x")
+
+
+def has_delegatecall(code_hex) -> bool:
+    code = normalize_code(code_hex)
+    if not code:
+        return False
+    return any(op in (OP_DELEGATECALL, OP_CALLCODE) for _, op, _ in iter_opcodes(bytes.fromhex(code)))
+
+
+def _match_fixed(code: str):
+    for pattern, proxy_type, regex in FIXED_PATTERNS:
+        m = regex.match(code)
+        if not m:
+            continue
+        addr_hex = m.group("addr")
+        if "push" in m.groupdict():
+            size = int(m.group("push"), 16) - OP_PUSH1 + 1
+            if len(addr_hex) != size * 2:
+                continue
+        impl = _address_from_operand(bytes.fromhex(addr_hex))
+        if impl:
+            return {"isProxy": True, "type": proxy_type, "pattern": pattern, "implementation": impl}
+    return None
+
+
+def _match_stub(ops):
+    delegatecalls = 0
+    targets = []
+    prev_push4 = False
+    for _, op, operand in ops:
+        if op == OP_DELEGATECALL:
+            delegatecalls += 1
+        elif op == OP_SLOAD:
+            return None
+        elif op == OP_EQ and prev_push4:
+            # Selector dispatch: a contract with functions, not a forwarding stub.
+            return None
+        elif op in (OP_PUSH20, OP_PUSH32):
+            addr = _address_from_operand(operand)
+            if addr and addr not in targets:
+                targets.append(addr)
+        prev_push4 = op == OP_PUSH4
+    if delegatecalls == 1 and len(targets) == 1:
+        return {"isProxy": True, "type": "FixedProxy", "pattern": "delegatecall-stub", "implementation": targets[0]}
+    return None
+
+
+def detect_proxy(code_hex) -> Optional[dict]:
+    """Classify runtime code.
+
+    Returns None for non-proxies, else `{"isProxy", "type", "pattern", "implementation"}`
+    where `implementation` is None for storage-based proxies (resolve via RPC).
+    """
+    code = normalize_code(code_hex)
+    if not code:
+        return None
+    fixed = _match_fixed(code)
+    if fixed:
+        return fixed
+
+    raw = bytes.fromhex(code)
+    ops = list(iter_opcodes(raw))
+    if not any(op in (OP_DELEGATECALL, OP_CALLCODE) for _, op, _ in ops):
+        return None
+
+    if len(raw) <= MAX_STUB_SIZE:
+        stub = _match_stub(ops)
+        if stub:
+            return stub
+
+    selectors = set()
+    for _, op, operand in ops:
+        if op == OP_PUSH32 and operand.hex() in SLOT_HINTS:
+            return {"isProxy": True, "type": SLOT_HINTS[operand.hex()], "pattern": "storage-slot", "implementation": None}
+        if op == OP_PUSH4:
+            selectors.add(operand.hex())
+    if EIP897_SELECTORS <= selectors:
+        return {"isProxy": True, "type": "EIP897Proxy", "pattern": "eip897", "implementation": None}
+    return None
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: bytecode_proxy.py <runtime-code-hex>", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(detect_proxy(sys.argv[1]), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
+import itertools
 import json
 import os
 import sys
+import threading
 import time
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode, urlsplit
+
+from bytecode_proxy import detect_proxy, has_delegatecall
+from http_pool import ConnectionPool, PoolError
+from response_cache import CACHE_MODES, CacheMiss, ResponseCache
 
 DEFAULT_SOURCIFY_BASE = "https://sourcify.dev/server"
 DEFAULT_ETHERSCAN_BASE = "https://api.etherscan.io/v2/api"
@@ -14,59 +21,103 @@ DEFAULT_SQD_GATEWAY_BASE = "https://v2.archive.subsquid.io/network"
 
 EIP1967_IMPLEMENTATION_SLOT = "0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"
 EIP1967_BEACON_SLOT = "0xa3f0ad74e5423aebfd80d3ef4346578335a9a72aeaee59ff6cb3582b35133d50"
+EIP1967_ADMIN_SLOT = "0xb53127684a568b3173ae13b9f8a6016e243e63b6e8ee1178d6a717850b5d6103"
+# Legacy OpenZeppelin (ZeppelinOS) unstructured storage slots.
+OZ_LEGACY_IMPLEMENTATION_SLOT = "0x7050c9e0f4ca769c69bd3a8ef740bc37934f8e2c036e5a723fd8ee048ed3f8c3"
+OZ_LEGACY_ADMIN_SLOT = "0x10d6a54a4754c8869d6886b5f5d7fbfa5b4522237ea5c60d11bc4e7a1ff9390b"
 BEACON_IMPL_SELECTOR = "0x5c60da1b"
+# Proxy types whose target is baked into the runtime code (identical code => identical target).
+CODE_EMBEDDED_PROXY_TYPES = ("EIP1167Proxy", "FixedProxy")
+
+# slots.json key -> storage slot, read for every address in the first RPC wave.
+PROXY_SLOTS = {
+    "implementation": EIP1967_IMPLEMENTATION_SLOT,
+    "beacon": EIP1967_BEACON_SLOT,
+    "admin": EIP1967_ADMIN_SLOT,
+    "ozImplementation": OZ_LEGACY_IMPLEMENTATION_SLOT,
+    "ozAdmin": OZ_LEGACY_ADMIN_SLOT,
+}
 
 
 class FetchError(Exception):
     pass
 
 
-def http_text(url, method="GET", body=None, headers=None, timeout=30):
+# Per-host concurrency caps so a wide worker pool does not hammer a single API.
+_host_limit = 0
+_host_sems = {}
+_host_lock = threading.Lock()
+
+
+def set_per_host_limit(limit):
+    global _host_limit
+    with _host_lock:
+        _host_limit = max(0, int(limit))
+        _host_sems.clear()
+
+
+@contextmanager
+def host_slot(url):
+    if not _host_limit:
+        yield
+        return
+    host = urlsplit(url).netloc.lower()
+    with _host_lock:
+        sem = _host_sems.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(_host_limit)
+            _host_sems[host] = sem
+    with sem:
+        yield
+
+
+# Shared keep-alive transport for Sourcify, Etherscan, RPC and SQD calls.
+HTTP_POOL = ConnectionPool(pool_size=4)
+
+
+def configure_http_pool(pool_size):
+    global HTTP_POOL
+    HTTP_POOL.close()
+    HTTP_POOL = ConnectionPool(pool_size=pool_size)
+
+
+def http_request(url, method="GET", body=None, headers=None, timeout=30):
     data = None
+    hdrs = {}
     if body is not None:
         data = json.dumps(body).encode("utf-8")
-    req = Request(url, data=data, method=method)
-    # Some gateways sit behind Cloudflare and may block default Python user agents.
-    req.add_header("User-Agent", "curl/8.0.0")
+        hdrs["Content-Type"] = "application/json"
     if headers:
-        for k, v in headers.items():
-            req.add_header(k, v)
+        hdrs.update(headers)
     try:
-        with urlopen(req, timeout=timeout) as resp:
-            return resp.read().decode("utf-8").strip()
-    except HTTPError as e:
-        if e.code == 404:
-            return ""
-        raise FetchError(f"HTTP {e.code} for {url}") from e
-    except URLError as e:
+        with host_slot(url):
+            return HTTP_POOL.request(method, url, body=data, headers=hdrs, timeout=timeout)
+    except PoolError as e:
         raise FetchError(f"URL error for {url}: {e}") from e
 
 
+def http_text(url, method="GET", body=None, headers=None, timeout=30):
+    status, raw = http_request(url, method=method, body=body, headers=headers, timeout=timeout)
+    if status == 404:
+        return ""
+    if status >= 400:
+        raise FetchError(f"HTTP {status} for {url}")
+    return raw.decode("utf-8").strip()
+
+
 def http_json(url, method="GET", body=None, headers=None, timeout=30):
-    data = None
-    if body is not None:
-        data = json.dumps(body).encode("utf-8")
-    req = Request(url, data=data, method=method)
-    # Some gateways sit behind Cloudflare and may block default Python user agents.
-    req.add_header("User-Agent", "curl/8.0.0")
-    req.add_header("Accept", "application/json")
-    if body is not None:
-        req.add_header("Content-Type", "application/json")
+    hdrs = {"Accept": "application/json"}
     if headers:
-        for k, v in headers.items():
-            req.add_header(k, v)
+        hdrs.update(headers)
+    status, raw = http_request(url, method=method, body=body, headers=hdrs, timeout=timeout)
+    if status == 404:
+        return None
+    if status >= 400:
+        raise FetchError(f"HTTP {status} for {url}")
+    if not raw:
+        return None
     try:
-        with urlopen(req, timeout=timeout) as resp:
-            raw = resp.read().decode("utf-8")
-            if not raw:
-                return None
-            return json.loads(raw)
-    except HTTPError as e:
-        if e.code == 404:
-            return None
-        raise FetchError(f"HTTP {e.code} for {url}") from e
-    except URLError as e:
-        raise FetchError(f"URL error for {url}: {e}") from e
+        return json.loads(raw)
     except json.JSONDecodeError as e:
         raise FetchError(f"Invalid JSON from {url}: {e}") from e
 
@@ -90,6 +141,15 @@ def write_json(path, obj):
         json.dump(obj, f, indent=2, sort_keys=False)
 
 
+def load_info(contract_dir):
+    """Return a completed contract's `info.json`, or None if it is missing or torn."""
+    try:
+        with open(os.path.join(contract_dir, "info.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
 def write_sources(base_dir, sources_map, fallback_name="Contract.sol"):
     for file_path, info in sources_map.items():
         if isinstance(info, dict) and "content" in info:
@@ -142,6 +202,52 @@ def parse_etherscan_source(source_code_raw):
     return {"Contract.sol": {"content": raw}}
 
 
+# Optional on-disk cache for Sourcify/Etherscan lookups (set from --cache-dir).
+RESPONSE_CACHE = None
+
+
+def configure_response_cache(cache_dir, mode, max_bytes):
+    global RESPONSE_CACHE
+    RESPONSE_CACHE = ResponseCache(cache_dir, mode=mode, max_bytes=max_bytes)
+
+
+def cached_lookup(key, fetch, classify):
+    if RESPONSE_CACHE is None:
+        return fetch()
+    try:
+        return RESPONSE_CACHE.fetch(key, fetch, classify)
+    except CacheMiss as e:
+        raise FetchError(str(e)) from e
+
+
+def classify_sourcify(resp):
+    if not resp:
+        return "unverified"
+    if (resp.get("proxyResolution") or {}).get("isProxy"):
+        return "proxy"
+    if resp.get("sources") or resp.get("abi"):
+        return "verified"
+    return "unverified"
+
+
+def classify_etherscan(resp):
+    if not isinstance(resp, dict):
+        return None
+    result = resp.get("result")
+    if resp.get("status") != "1":
+        # Only cache definitive "not verified" answers, never rate-limit/key errors.
+        if isinstance(result, str) and "not verified" in result.lower():
+            return "unverified"
+        return None
+    if isinstance(result, list) and result and isinstance(result[0], dict):
+        item = result[0]
+        if not parse_etherscan_source(item.get("SourceCode", "")):
+            return "unverified"
+        if str(item.get("Proxy", "0")).strip() == "1":
+            return "proxy"
+    return "verified"
+
+
 def etherscan_get(base_url, chain_id, address, action, api_key):
     params = {
         "chainid": str(chain_id),
@@ -151,16 +257,27 @@ def etherscan_get(base_url, chain_id, address, action, api_key):
         "apikey": api_key or ""
     }
     url = f"{base_url}?{urlencode(params)}"
-    return http_json(url)
+    key = {"endpoint": base_url, "chain": str(chain_id), "address": address, "action": action}
+    return cached_lookup(key, lambda: http_json(url), classify_etherscan)
 
 
 def sourcify_contract(base_url, chain_id, address, fields):
     url = f"{base_url}/v2/contract/{chain_id}/{address}?fields={fields}"
-    return http_json(url)
+    key = {"endpoint": base_url, "chain": str(chain_id), "address": address, "fields": fields}
+    return cached_lookup(key, lambda: http_json(url), classify_sourcify)
+
+
+_rpc_ids = itertools.count(1)
+_rpc_id_lock = threading.Lock()
+
+
+def next_rpc_id():
+    with _rpc_id_lock:
+        return next(_rpc_ids)
 
 
 def rpc_call(rpc_url, method, params):
-    payload = {"jsonrpc": "2.0", "id": int(time.time()), "method": method, "params": params}
+    payload = {"jsonrpc": "2.0", "id": next_rpc_id(), "method": method, "params": params}
     resp = http_json(rpc_url, method="POST", body=payload)
     if resp is None:
         return None
@@ -169,6 +286,122 @@ def rpc_call(rpc_url, method, params):
     return resp.get("result")
 
 
+def rpc_batch(rpc_url, calls, batch_size=100):
+    """Run `(method, params)` calls as JSON-RPC batch arrays; results align with `calls`.
+
+    Responses are matched by id (servers may reorder them); per-call errors yield None.
+    Endpoints that reject batches get the chunk replayed as single calls.
+    """
+    results = [None] * len(calls)
+    batch_size = max(1, int(batch_size))
+    for start in range(0, len(calls), batch_size):
+        chunk = calls[start:start + batch_size]
+        ids = {}
+        payload = []
+        for offset, (method, params) in enumerate(chunk):
+            rpc_id = next_rpc_id()
+            ids[rpc_id] = start + offset
+            payload.append({"jsonrpc": "2.0", "id": rpc_id, "method": method, "params": params})
+        resp = http_json(rpc_url, method="POST", body=payload)
+        if not isinstance(resp, list):
+            for offset, (method, params) in enumerate(chunk):
+                results[start + offset] = rpc_call(rpc_url, method, params)
+            continue
+        for item in resp:
+            if not isinstance(item, dict) or "error" in item:
+                continue
+            idx = ids.get(item.get("id"))
+            if idx is not None:
+                results[idx] = item.get("result")
+    return results
+
+
+class ProxySlotReader:
+    """Batched proxy-slot detection shared by all crawl workers.
+
+    Wave 1 reads every `PROXY_SLOTS` entry for a set of addresses; wave 2 calls
+    `implementation()` on each distinct beacon found. `prefetch()` runs both waves for
+    the seed list up front; `read()` serves from that table and probes stragglers
+    (proxy children) on demand.
+    """
+
+    def __init__(self, rpc_url, batch_size=100, workers=1):
+        self.rpc_url = rpc_url
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(1, int(workers))
+        self._lock = threading.Lock()
+        self._slots = {}
+
+    def _batch(self, calls):
+        if self.workers == 1 or len(calls) <= self.batch_size:
+            return rpc_batch(self.rpc_url, calls, self.batch_size)
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rpc") as pool:
+            parts = pool.map(lambda c: rpc_batch(self.rpc_url, c, self.batch_size), chunks)
+            return [r for part in parts for r in part]
+
+    def probe(self, addresses):
+        addresses = [a for a in dict.fromkeys(addresses) if a]
+        calls = []
+        for address in addresses:
+            for slot in PROXY_SLOTS.values():
+                calls.append(("eth_getStorageAt", [address, slot, "latest"]))
+        values = iter(self._batch(calls))
+        table = {}
+        for address in addresses:
+            table[address] = {name: next(values) for name in PROXY_SLOTS}
+
+        beacons = {}
+        for address, slots in table.items():
+            beacon_addr = slot_to_address(slots["beacon"])
+            if beacon_addr:
+                slots["beaconAddress"] = beacon_addr
+                beacons.setdefault(beacon_addr, []).append(slots)
+        if beacons:
+            calls = [("eth_call", [{"to": b, "data": BEACON_IMPL_SELECTOR}, "latest"]) for b in beacons]
+            for slot_list, impl_call in zip(beacons.values(), self._batch(calls)):
+                for slots in slot_list:
+                    slots["beaconImplementationRaw"] = impl_call
+
+        with self._lock:
+            self._slots.update(table)
+        return table
+
+    def prefetch(self, addresses):
+        with self._lock:
+            todo = [a for a in addresses if a not in self._slots]
+        if todo:
+            self.probe(todo)
+
+    def read(self, address):
+        with self._lock:
+            slots = self._slots.get(address)
+        if slots is None:
+            slots = self.probe([address])[address]
+        return slots
+
+
+def strip_code_metadata(code_hex):
+    """Drop the trailing CBOR metadata (solc/vyper) so recompiles with different
+    metadata hashes but identical logic hash the same."""
+    code = code_hex[2:] if code_hex.startswith("0x") else code_hex
+    if len(code) < 4:
+        return code
+    meta_len = int(code[-4:], 16)
+    start = len(code) - 4 - meta_len * 2
+    # The segment must look like a CBOR map (major type 5) to be stripped.
+    if meta_len and start >= 0 and 0xa0 <= int(code[start:start + 2], 16) <= 0xbf:
+        return code[:start]
+    return code
+
+
+def runtime_code_hash(code_hex):
+    if not code_hex or code_hex in ("0x", "0x0"):
+        return None
+    stripped = strip_code_metadata(code_hex.lower())
+    return "sha256:" + hashlib.sha256(bytes.fromhex(stripped)).hexdigest()
+
+
 def slot_to_address(slot_value):
     if not slot_value or not slot_value.startswith("0x"):
         return None
@@ -237,8 +470,12 @@ def sqd_last_block_number(batch):
     raise FetchError("Header missing block number/height")
 
 
-def sqd_dump_ndjson(gateway_url, base_query, out_path, from_block, to_block=None, include_all_blocks=False,
-                    router_timeout=30, worker_timeout=120, sleep_sec=0.0, max_batches=0):
+def sqd_iter_blocks(gateway_url, base_query, from_block, to_block=None, include_all_blocks=False,
+                    router_timeout=30, worker_timeout=120, sleep_sec=0.0, max_batches=0, summary=None):
+    """Yield block items for `base_query` over [from_block, to_block] via the router/worker loop.
+
+    `summary` (if given) is filled with fromBlock/toBlock/height/batches as the loop runs.
+    """
     gateway = gateway_url.rstrip("/")
     height = sqd_height(gateway, timeout=router_timeout)
     end = min(int(to_block) if to_block is not None else height, height)
@@ -247,38 +484,100 @@ def sqd_dump_ndjson(gateway_url, base_query, out_path, from_block, to_block=None
         raise FetchError("fromBlock is required for SQD dump")
     current = int(from_block)
 
-    ensure_dir(os.path.dirname(out_path))
+    if summary is None:
+        summary = {}
+    summary.update({"fromBlock": int(from_block), "toBlock": end, "height": height, "batches": 0})
+
+    while current <= end:
+        worker = sqd_worker_url(gateway, current, timeout=router_timeout)
+        # Copy the query without mutating the caller's object.
+        q = json.loads(json.dumps(base_query))
+        q["fromBlock"] = current
+        q["toBlock"] = end
+        if include_all_blocks:
+            q["includeAllBlocks"] = True
+
+        batch = http_json(worker, method="POST", body=q, timeout=worker_timeout)
+        if not isinstance(batch, list):
+            raise FetchError("Worker response is not a JSON array")
+        yield from batch
+
+        last = sqd_last_block_number(batch)
+        if last < current:
+            raise FetchError(f"Non-advancing SQD batch: last={last} current={current}")
+        current = last + 1
+
+        summary["batches"] += 1
+        if max_batches and summary["batches"] >= max_batches:
+            break
+        if sleep_sec:
+            time.sleep(sleep_sec)
 
-    batches = 0
+
+def sqd_dump_ndjson(gateway_url, base_query, out_path, from_block, to_block=None, include_all_blocks=False,
+                    router_timeout=30, worker_timeout=120, sleep_sec=0.0, max_batches=0):
+    ensure_dir(os.path.dirname(out_path))
+    summary = {}
+    blocks = sqd_iter_blocks(gateway_url, base_query, from_block, to_block=to_block,
+                             include_all_blocks=include_all_blocks, router_timeout=router_timeout,
+                             worker_timeout=worker_timeout, sleep_sec=sleep_sec, max_batches=max_batches,
+                             summary=summary)
     with open(out_path, "w", encoding="utf-8") as out_f:
-        while current <= end:
-            worker = sqd_worker_url(gateway, current, timeout=router_timeout)
-            # Copy the query without mutating the caller's object.
-            q = json.loads(json.dumps(base_query))
-            q["fromBlock"] = current
-            q["toBlock"] = end
-            if include_all_blocks:
-                q["includeAllBlocks"] = True
-
-            batch = http_json(worker, method="POST", body=q, timeout=worker_timeout)
-            if not isinstance(batch, list):
-                raise FetchError("Worker response is not a JSON array")
-            for item in batch:
-                out_f.write(json.dumps(item, separators=(",", ":"), sort_keys=False))
-                out_f.write("\n")
-
-            last = sqd_last_block_number(batch)
-            if last < current:
-                raise FetchError(f"Non-advancing SQD batch: last={last} current={current}")
-            current = last + 1
-
-            batches += 1
-            if max_batches and batches >= max_batches:
-                break
-            if sleep_sec:
-                time.sleep(sleep_sec)
-
-    return {"fromBlock": int(from_block), "toBlock": end, "height": height, "batches": batches}
+        for item in blocks:
+            out_f.write(json.dumps(item, separators=(",", ":"), sort_keys=False))
+            out_f.write("\n")
+    return summary
+
+
+# Evidence type -> (block item list holding the matched items, field naming the contract).
+SQD_EVIDENCE_ROUTES = {
+    "logs": ("logs", "address"),
+    "transactions": ("transactions", "to"),
+    "traces": ("traces", "callTo"),
+    "stateDiffs": ("stateDiffs", "address"),
+}
+SQD_ITEM_LISTS = ("logs", "transactions", "traces", "stateDiffs")
+
+
+def sqd_demux_block(evidence_type, item, wanted, include_all_blocks=False):
+    """Split one combined-query block into `{address: block_item}` for the addresses in `wanted`.
+
+    Primary items are routed by their address field; items pulled in through relations
+    (a transaction's logs, a trace's transaction, ...) follow their `transactionIndex`.
+    """
+    primary_list, field = SQD_EVIDENCE_ROUTES[evidence_type]
+    parts = {}
+    tx_owners = {}
+    for entry in item.get(primary_list) or []:
+        value = entry.get(field)
+        if value is None and field == "callTo":
+            value = (entry.get("action") or {}).get("to")
+        address = normalize_address(value or "")
+        if address not in wanted:
+            continue
+        parts.setdefault(address, {}).setdefault(primary_list, []).append(entry)
+        if entry.get("transactionIndex") is not None:
+            tx_owners.setdefault(entry["transactionIndex"], set()).add(address)
+
+    for name in SQD_ITEM_LISTS:
+        if name == primary_list:
+            continue
+        for entry in item.get(name) or []:
+            for address in sorted(tx_owners.get(entry.get("transactionIndex"), ())):
+                parts[address].setdefault(name, []).append(entry)
+
+    if include_all_blocks:
+        for address in wanted:
+            parts.setdefault(address, {})
+    header = item.get("header")
+    out = {}
+    for address, lists in parts.items():
+        block = {"header": header}
+        for name in SQD_ITEM_LISTS:
+            if name in lists:
+                block[name] = lists[name]
+        out[address] = block
+    return out
 
 
 def load_addresses(args):
@@ -302,6 +601,628 @@ def load_addresses(args):
     return list(dict.fromkeys(addrs))
 
 
+def slot_probe_skip_reason(code, detected=None):
+    """Why proxy-slot reads can be skipped for this runtime code, or None to read them."""
+    if code is None:
+        return None
+    if code in ("0x", "0x0", ""):
+        return "no-code"
+    if detected is None:
+        detected = detect_proxy(code)
+    if detected and detected["implementation"]:
+        return "code-embedded-target"
+    if not has_delegatecall(code):
+        return "no-delegatecall"
+    return None
+
+
+class CodeIndex:
+    """Runtime-bytecode pre-pass for clone deduplication.
+
+    `eth_getCode` is batched like the proxy-slot reads. The first address to claim a
+    code hash becomes the canonical bundle; later claimants are recorded as duplicates
+    of it. Seeds are claimed up front in input order so the choice is stable.
+    """
+
+    def __init__(self, rpc_url, batch_size=100):
+        self.rpc_url = rpc_url
+        self.batch_size = max(1, int(batch_size))
+        self._lock = threading.Lock()
+        self._code = {}
+        self._canonical = {}
+
+    def prefetch(self, addresses):
+        with self._lock:
+            todo = [a for a in dict.fromkeys(addresses) if a and a not in self._code]
+        if not todo:
+            return
+        codes = rpc_batch(self.rpc_url, [("eth_getCode", [a, "latest"]) for a in todo], self.batch_size)
+        with self._lock:
+            self._code.update(zip(todo, codes))
+
+    def code(self, address):
+        with self._lock:
+            if address in self._code:
+                return self._code[address]
+        self.prefetch([address])
+        with self._lock:
+            return self._code.get(address)
+
+    def code_hash(self, address):
+        return runtime_code_hash(self.code(address))
+
+    def claim(self, code_hash, address):
+        with self._lock:
+            return self._canonical.setdefault(code_hash, address)
+
+
+class CrawlCheckpoint:
+    """Append-only NDJSON log of crawl progress (`chain-<id>/checkpoint.ndjson`).
+
+    Records:
+    - `discover`: an address entered the frontier (or was re-keyed to a shorter path)
+    - `done`: the contract's bundle and `info.json` are complete
+    - `evidence`: SQD evidence for the contract is complete
+    Replaying the log rebuilds the frontier, visited set and completion markers; the
+    last `discover` record per address wins. A torn trailing line is ignored.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.nodes = {}
+        self.done = set()
+        self.evidence = set()
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            self._replay()
+        ensure_dir(os.path.dirname(path))
+        self._f = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _replay(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                event = rec.get("event")
+                address = rec.get("address")
+                if event == "discover":
+                    self.nodes[address] = (tuple(rec["key"]), rec.get("parent"))
+                elif event == "done":
+                    self.done.add(address)
+                elif event == "evidence":
+                    self.evidence.add(address)
+
+    def _append(self, rec):
+        with self._lock:
+            self._f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            self._f.flush()
+
+    def discovered(self, address, key, parent):
+        self._append({"event": "discover", "address": address, "key": list(key), "parent": parent})
+
+    def completed(self, address):
+        self._append({"event": "done", "address": address})
+
+    def evidence_completed(self, address):
+        self._append({"event": "evidence", "address": address})
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+
+
+class CrawlNode:
+    __slots__ = ("address", "key", "parent", "info", "done")
+
+    def __init__(self, address, key, parent):
+        self.address = address
+        # Path of child indexes from a seed; ordering by (len(key), key) reproduces the
+        # sequential BFS order regardless of which worker finishes first.
+        self.key = key
+        self.parent = parent
+        self.info = None
+        self.done = False
+
+    @property
+    def depth(self):
+        return len(self.key) - 1
+
+    def sort_key(self):
+        return (len(self.key), self.key)
+
+
+class Crawler:
+    """Thread-safe proxy-graph BFS over a bounded worker pool.
+
+    `fetch(address, parent)` runs on a worker and returns the contract info; proxy
+    implementations are enqueued as soon as it returns. When an address is reached
+    by several parents, the BFS-earliest path wins, so parent/depth (and therefore the
+    manifest) are identical to a sequential run.
+    """
+
+    def __init__(self, fetch, max_depth, concurrency=1, checkpoint=None):
+        self._fetch = fetch
+        self._max_depth = max_depth
+        self._concurrency = max(1, int(concurrency))
+        self._checkpoint = checkpoint
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._nodes = {}
+        self._pending = 0
+        self._error = None
+        self._executor = None
+
+    def run(self, seeds, restored=()):
+        """Crawl from `seeds`; `restored` holds `(address, key, parent, info)` from a checkpoint.
+
+        Restored entries with an `info` are treated as complete and only re-expanded;
+        the rest go back on the frontier.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="bundle")
+        try:
+            with self._lock:
+                for address, key, parent, info in restored:
+                    node = CrawlNode(address, tuple(key), parent)
+                    node.info = info
+                    node.done = info is not None
+                    self._nodes[address] = node
+                for node in list(self._nodes.values()):
+                    if node.done:
+                        self._expand(node)
+                    else:
+                        self._submit(node)
+                for idx, address in enumerate(seeds):
+                    self._discover(address, (idx,), None)
+                while self._pending and self._error is None:
+                    # Timed wait keeps the main thread responsive to Ctrl-C.
+                    self._idle.wait(0.5)
+                if self._error is not None:
+                    raise self._error
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        return sorted(self._nodes.values(), key=CrawlNode.sort_key)
+
+    def _discover(self, address, key, parent):
+        # Caller holds self._lock.
+        address = normalize_address(address)
+        if not address:
+            return
+        node = self._nodes.get(address)
+        if node is None:
+            node = CrawlNode(address, key, parent)
+            self._nodes[address] = node
+            if self._checkpoint is not None:
+                self._checkpoint.discovered(address, key, parent)
+            self._submit(node)
+            return
+        if (len(key), key) >= node.sort_key():
+            return
+        node.key = key
+        node.parent = parent
+        if self._checkpoint is not None:
+            self._checkpoint.discovered(address, key, parent)
+        if node.done:
+            # A shorter path may lift the depth cap or re-key the subtree.
+            self._expand(node)
+
+    def _submit(self, node):
+        # Caller holds self._lock.
+        self._pending += 1
+        self._executor.submit(self._work, node)
+
+    def _expand(self, node):
+        # Caller holds self._lock.
+        if node.depth >= self._max_depth:
+            return
+        for idx, impl in enumerate(node.info["proxy"]["implementations"]):
+            self._discover(impl, node.key + (idx,), node.address)
+
+    def _work(self, node):
+        try:
+            with self._lock:
+                parent = node.parent
+            info = self._fetch(node.address, parent)
+            with self._lock:
+                node.info = info
+                node.done = True
+                if self._checkpoint is not None:
+                    self._checkpoint.completed(node.address)
+                self._expand(node)
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._idle.notify_all()
+
+
+def fetch_sources(args, chain_id, address, info, contract_dir):
+    """Fill sources/ABI/verification/proxy hints from Sourcify, then Etherscan."""
+    src_dir = os.path.join(contract_dir, "src")
+    abi_dir = os.path.join(contract_dir, "abi")
+    meta_dir = os.path.join(contract_dir, "metadata")
+    ensure_dir(src_dir)
+    ensure_dir(abi_dir)
+    ensure_dir(meta_dir)
+
+    # Sourcify lookup
+    sourcify_data = None
+    if not args.skip_sourcify:
+        try:
+            sourcify_data = sourcify_contract(args.sourcify_base, chain_id, address, args.sourcify_fields)
+        except FetchError as e:
+            sourcify_data = None
+            info["verification"]["sourcify_error"] = str(e)
+
+    if sourcify_data:
+        write_json(os.path.join(meta_dir, "sourcify-contract.json"), sourcify_data)
+        sources = sourcify_data.get("sources") or {}
+        if sources:
+            write_sources(src_dir, sources)
+            info["sources"] = "sourcify"
+        abi = sourcify_data.get("abi")
+        if abi:
+            write_json(os.path.join(abi_dir, "abi.json"), abi)
+            info["abi"] = "sourcify"
+        info["compiler"] = sourcify_data.get("compilation", {}).get("compilerVersion")
+        info["verification"]["sourcify"] = {
+            "match": sourcify_data.get("match"),
+            "creationMatch": sourcify_data.get("creationMatch"),
+            "runtimeMatch": sourcify_data.get("runtimeMatch"),
+            "verifiedAt": sourcify_data.get("verifiedAt")
+        }
+        proxy_res = sourcify_data.get("proxyResolution") or {}
+        if proxy_res.get("isProxy"):
+            info["proxy"]["isProxy"] = True
+            info["proxy"]["type"] = proxy_res.get("proxyType")
+            impls = []
+            for item in proxy_res.get("implementations", []):
+                addr = normalize_address(item.get("address", "")) if isinstance(item, dict) else normalize_address(str(item))
+                if addr:
+                    impls.append(addr)
+            info["proxy"]["implementations"].extend(impls)
+        # Deployment info (when present) is useful for selecting a sensible evidence start block.
+        dep = sourcify_data.get("deployment") or {}
+        if isinstance(dep, dict) and dep.get("blockNumber") is not None:
+            info["verification"]["deploymentBlockNumber"] = dep.get("blockNumber")
+
+    # Etherscan fallback or complement
+    etherscan_item = None
+    if not args.skip_etherscan and (not info["sources"] or not info["abi"]):
+        if not args.etherscan_key:
+            info["verification"]["etherscan_error"] = "Missing Etherscan API key"
+        else:
+            try:
+                src_resp = etherscan_get(args.etherscan_base, chain_id, address, "getsourcecode", args.etherscan_key)
+                if src_resp and src_resp.get("status") == "1":
+                    result = src_resp.get("result") or []
+                    if result:
+                        etherscan_item = result[0]
+                        write_json(os.path.join(meta_dir, "etherscan-source.json"), src_resp)
+                        if not info["sources"]:
+                            sources = parse_etherscan_source(etherscan_item.get("SourceCode", ""))
+                            if sources:
+                                contract_name = etherscan_item.get("ContractName") or "Contract"
+                                write_sources(src_dir, sources, f"{contract_name}.sol")
+                                info["sources"] = "etherscan"
+                        info["compiler"] = etherscan_item.get("CompilerVersion") or info["compiler"]
+                        info["verification"]["etherscan"] = {
+                            "contractName": etherscan_item.get("ContractName"),
+                            "compilerVersion": etherscan_item.get("CompilerVersion"),
+                            "optimizationUsed": etherscan_item.get("OptimizationUsed"),
+                            "runs": etherscan_item.get("Runs"),
+                            "licenseType": etherscan_item.get("LicenseType")
+                        }
+            except FetchError as e:
+                info["verification"]["etherscan_error"] = str(e)
+
+            if not info["abi"]:
+                try:
+                    abi_resp = etherscan_get(args.etherscan_base, chain_id, address, "getabi", args.etherscan_key)
+                    if abi_resp and abi_resp.get("status") == "1":
+                        abi_raw = abi_resp.get("result")
+                        abi = json.loads(abi_raw) if isinstance(abi_raw, str) else abi_raw
+                        write_json(os.path.join(abi_dir, "abi.json"), abi)
+                        info["abi"] = "etherscan"
+                except (FetchError, json.JSONDecodeError) as e:
+                    info["verification"]["etherscan_abi_error"] = str(e)
+
+    # Proxy hints from etherscan
+    if etherscan_item:
+        info["proxy"]["implementations"].extend(parse_impls_from_etherscan(etherscan_item))
+        if str(etherscan_item.get("Proxy", "0")).strip() == "1":
+            info["proxy"]["isProxy"] = True
+
+
+def fetch_contract(args, chain_id, out_dir, address, parent, slot_reader=None, code_index=None):
+    contract_dir = os.path.join(out_dir, f"chain-{chain_id}", address)
+    rpc_dir = os.path.join(contract_dir, "rpc")
+    ensure_dir(rpc_dir)
+
+    info = {
+        "address": address,
+        "chainId": chain_id,
+        "parent": parent,
+        "sources": None,
+        "abi": None,
+        "compiler": None,
+        "verification": {},
+        "proxy": {
+            "isProxy": False,
+            "type": None,
+            "implementations": []
+        },
+        "evidence": {}
+    }
+
+    duplicate_of = None
+    if code_index is not None and args.dedupe_bytecode:
+        code_hash = code_index.code_hash(address)
+        if code_hash:
+            info["codeHash"] = code_hash
+            canonical = code_index.claim(code_hash, address)
+            if canonical != address:
+                duplicate_of = canonical
+                info["duplicateOf"] = canonical
+
+    if duplicate_of is None:
+        fetch_sources(args, chain_id, address, info, contract_dir)
+
+    # Offline proxy recognition from runtime bytecode
+    code = None
+    skip_reason = None
+    if code_index is not None and not args.skip_bytecode_scan:
+        code = code_index.code(address)
+        detected = detect_proxy(code) if code else None
+        if detected:
+            info["proxy"]["isProxy"] = True
+            info["proxy"]["type"] = info["proxy"]["type"] or detected["type"]
+            info["proxy"]["bytecodePattern"] = detected["pattern"]
+            if detected["implementation"]:
+                info["proxy"]["implementations"].append(detected["implementation"])
+        skip_reason = slot_probe_skip_reason(code, detected)
+
+    # RPC proxy detection
+    if slot_reader is not None and skip_reason is not None:
+        write_json(os.path.join(rpc_dir, "slots.json"), {"skipped": skip_reason})
+    elif slot_reader is not None:
+        slots = dict(slot_reader.read(address))
+        impl_addr = slot_to_address(slots["implementation"])
+        beacon_addr = slots.get("beaconAddress")
+        oz_impl_addr = slot_to_address(slots["ozImplementation"])
+        if impl_addr:
+            info["proxy"]["isProxy"] = True
+            info["proxy"]["type"] = info["proxy"]["type"] or "EIP1967Proxy"
+            info["proxy"]["implementations"].append(impl_addr)
+        if beacon_addr:
+            info["proxy"]["isProxy"] = True
+            info["proxy"]["type"] = info["proxy"]["type"] or "EIP1967BeaconProxy"
+            impl_from_beacon = slot_to_address(slots.get("beaconImplementationRaw"))
+            if impl_from_beacon:
+                info["proxy"]["implementations"].append(impl_from_beacon)
+        if oz_impl_addr:
+            info["proxy"]["isProxy"] = True
+            info["proxy"]["type"] = info["proxy"]["type"] or "ZeppelinOSProxy"
+            info["proxy"]["implementations"].append(oz_impl_addr)
+        admin_addr = slot_to_address(slots["admin"]) or slot_to_address(slots["ozAdmin"])
+        if admin_addr:
+            info["proxy"]["admin"] = admin_addr
+
+        write_json(os.path.join(rpc_dir, "slots.json"), slots)
+
+    # Normalize proxy implementations list
+    impls = []
+    for item in info["proxy"]["implementations"]:
+        addr = normalize_address(item)
+        if addr and addr not in impls:
+            impls.append(addr)
+    info["proxy"]["implementations"] = impls
+
+    write_json(os.path.join(contract_dir, "info.json"), info)
+    return info
+
+
+def sqd_evidence_from_block(args, info):
+    """Evidence start block: --sqd-from-block, else the deployment block if known, else 0."""
+    from_block = args.sqd_from_block
+    if from_block is None:
+        dep_bn = info.get("verification", {}).get("deploymentBlockNumber")
+        try:
+            from_block = int(dep_bn) if dep_bn is not None and str(dep_bn).isdigit() else None
+        except (TypeError, ValueError):
+            from_block = None
+    if from_block is None:
+        from_block = 0
+    return from_block
+
+
+def sqd_evidence_query(args, evidence_type, addresses):
+    # Minimal field selection for evidence (avoid expensive defaults where possible).
+    fields_min = {
+        "transaction": {"hash": True, "from": True, "to": True, "input": True, "value": True},
+        "log": {"address": True, "topics": True, "data": True, "transactionHash": True},
+    }
+
+    if evidence_type == "logs":
+        return {
+            "fields": fields_min,
+            "logs": [
+                {
+                    "address": list(addresses),
+                }
+            ],
+        }
+    if evidence_type == "transactions":
+        txn_req = {"to": list(addresses)}
+        if args.sqd_with_tx_logs:
+            txn_req["logs"] = True
+        if args.sqd_with_tx_traces:
+            txn_req["traces"] = True
+        if args.sqd_with_tx_state_diffs:
+            txn_req["stateDiffs"] = True
+        return {
+            "fields": fields_min,
+            "transactions": [txn_req],
+        }
+    if evidence_type == "traces":
+        return {
+            "traces": [
+                {
+                    "type": ["call"],
+                    "callTo": list(addresses),
+                    "transaction": True,
+                }
+            ],
+        }
+    # stateDiffs
+    return {
+        "stateDiffs": [
+            {
+                "address": list(addresses),
+                "transaction": True,
+            }
+        ],
+    }
+
+
+def sqd_evidence_config(sqd_gateway, sqd_types, from_block, to_block):
+    return {
+        "gateway": sqd_gateway,
+        "types": sqd_types,
+        "fromBlock": from_block,
+        "toBlock": to_block,
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def collect_sqd_evidence(args, sqd_gateway, sqd_types, contract_dir, info):
+    address = info["address"]
+    sqd_dir = os.path.join(contract_dir, "sqd")
+    sqd_q_dir = os.path.join(sqd_dir, "queries")
+    sqd_r_dir = os.path.join(sqd_dir, "results")
+    ensure_dir(sqd_q_dir)
+    ensure_dir(sqd_r_dir)
+
+    from_block = sqd_evidence_from_block(args, info)
+    to_block = args.sqd_to_block
+    write_json(os.path.join(sqd_dir, "config.json"), sqd_evidence_config(sqd_gateway, sqd_types, from_block, to_block))
+
+    outputs = {}
+    for t in sqd_types:
+        if t not in SQD_EVIDENCE_ROUTES:
+            continue
+
+        query = sqd_evidence_query(args, t, [address])
+        write_json(os.path.join(sqd_q_dir, f"{t}.json"), query)
+        out_path = os.path.join(sqd_r_dir, f"{t}.ndjson")
+
+        try:
+            summary = sqd_dump_ndjson(
+                sqd_gateway,
+                query,
+                out_path,
+                from_block,
+                to_block=to_block,
+                include_all_blocks=args.sqd_include_all_blocks,
+                router_timeout=args.sqd_router_timeout,
+                worker_timeout=args.sqd_worker_timeout,
+                sleep_sec=args.sqd_sleep,
+                max_batches=args.sqd_max_batches,
+            )
+            outputs[t] = {"ndjson": os.path.relpath(out_path, contract_dir), "summary": summary}
+        except FetchError as e:
+            outputs[t] = {"error": str(e)}
+
+    info["evidence"]["sqd"] = {
+        "gateway": sqd_gateway,
+        "fromBlock": from_block,
+        "toBlock": to_block,
+        "types": sqd_types,
+        "outputs": outputs,
+    }
+
+
+def collect_sqd_evidence_combined(args, sqd_gateway, sqd_types, targets):
+    """Fetch evidence for many contracts with one query per type and demultiplex locally.
+
+    `targets` is a list of `(contract_dir, info)`. Contracts are grouped by
+    --sqd-combine-max; each group scans the archive once per evidence type from the
+    earliest member's start block, and every block is split into the members'
+    `sqd/results/<type>.ndjson` files in the same streaming pass.
+    """
+    to_block = args.sqd_to_block
+    group_size = max(1, args.sqd_combine_max)
+    for start in range(0, len(targets), group_size):
+        group = targets[start:start + group_size]
+        members = {}
+        for contract_dir, info in group:
+            from_block = sqd_evidence_from_block(args, info)
+            sqd_dir = os.path.join(contract_dir, "sqd")
+            ensure_dir(os.path.join(sqd_dir, "queries"))
+            ensure_dir(os.path.join(sqd_dir, "results"))
+            write_json(os.path.join(sqd_dir, "config.json"),
+                       dict(sqd_evidence_config(sqd_gateway, sqd_types, from_block, to_block), combined=True))
+            members[info["address"]] = (contract_dir, info, from_block)
+            info["evidence"]["sqd"] = {
+                "gateway": sqd_gateway,
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "types": sqd_types,
+                "outputs": {},
+            }
+        group_from = min(m[2] for m in members.values())
+
+        for t in sqd_types:
+            if t not in SQD_EVIDENCE_ROUTES:
+                continue
+            query = sqd_evidence_query(args, t, list(members))
+            if t == "traces":
+                # Needed to route each trace back to its contract.
+                query["fields"] = {"trace": {"callTo": True}}
+            files = {}
+            counts = dict.fromkeys(members, 0)
+            summary = {}
+            try:
+                for address, (contract_dir, _, _) in members.items():
+                    write_json(os.path.join(contract_dir, "sqd", "queries", f"{t}.json"), query)
+                    files[address] = open(os.path.join(contract_dir, "sqd", "results", f"{t}.ndjson"), "w", encoding="utf-8")
+                blocks = sqd_iter_blocks(sqd_gateway, query, group_from, to_block=to_block,
+                                         include_all_blocks=args.sqd_include_all_blocks,
+                                         router_timeout=args.sqd_router_timeout,
+                                         worker_timeout=args.sqd_worker_timeout,
+                                         sleep_sec=args.sqd_sleep, max_batches=args.sqd_max_batches,
+                                         summary=summary)
+                for item in blocks:
+                    number = int((item.get("header") or {}).get("number", 0))
+                    wanted = {a for a, m in members.items() if m[2] <= number}
+                    parts = sqd_demux_block(t, item, wanted, include_all_blocks=args.sqd_include_all_blocks)
+                    for address, block in parts.items():
+                        files[address].write(json.dumps(block, separators=(",", ":"), sort_keys=False))
+                        files[address].write("\n")
+                        counts[address] += 1
+                error = None
+            except FetchError as e:
+                error = str(e)
+            finally:
+                for f in files.values():
+                    f.close()
+
+            for address, (contract_dir, info, from_block) in members.items():
+                out_path = os.path.join(contract_dir, "sqd", "results", f"{t}.ndjson")
+                if error is not None:
+                    output = {"error": error}
+                else:
+                    output = {
+                        "ndjson": os.path.relpath(out_path, contract_dir),
+                        "summary": dict(summary, fromBlock=from_block, blocks=counts[address], combined=True),
+                    }
+                info["evidence"]["sqd"]["outputs"][t] = output
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch contract sources/ABI via Sourcify, Etherscan, RPC (+ optional SQD evidence)")
     parser.add_argument("--chain-id", required=True, help="Chain ID")
@@ -316,7 +1237,26 @@ def main():
     parser.add_argument("--skip-etherscan", action="store_true")
     parser.add_argument("--rpc-url", default=os.environ.get("RPC_URL", ""))
     parser.add_argument("--skip-rpc", action="store_true")
+    parser.add_argument("--rpc-batch-size", type=int, default=100,
+                        help="Max calls per JSON-RPC batch array for proxy-slot reads (default: 100)")
+    parser.add_argument("--skip-bytecode-scan", action="store_true",
+                        help="Do not fetch runtime code to recognise proxies offline (always read proxy slots)")
+    parser.add_argument("--dedupe-bytecode", action="store_true",
+                        help="Fetch sources/ABI once per runtime-code hash; byte-identical clones point at the canonical bundle")
     parser.add_argument("--max-depth", type=int, default=2, help="Max proxy-follow depth")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of contracts fetched in parallel (default: 1 = sequential)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted crawl from chain-<id>/checkpoint.ndjson, skipping completed contracts")
+    parser.add_argument("--per-host-limit", type=int, default=4,
+                        help="Max in-flight HTTP requests per host when --concurrency > 1 (0 = unlimited)")
+    parser.add_argument("--pool-size", type=int, default=4,
+                        help="Idle keep-alive connections kept per host (default: 4)")
+    parser.add_argument("--cache-dir", default="",
+                        help="Directory for the Sourcify/Etherscan response cache (disabled when empty)")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="use",
+                        help="use = serve fresh entries, refresh = refetch everything, offline = never hit the network")
+    parser.add_argument("--cache-max-mb", type=int, default=2048, help="Cache size bound; LRU entries are evicted beyond it")
     # SQD / SubSquid evidence extraction (optional)
     parser.add_argument("--sqd-gateway", default="",
                         help="SQD gateway URL (router), e.g. https://v2.archive.subsquid.io/network/ethereum-mainnet")
@@ -336,11 +1276,23 @@ def main():
     parser.add_argument("--sqd-sleep", type=float, default=0.0, help="Sleep between SQD requests (rate limiting/backoff)")
     parser.add_argument("--sqd-max-batches", type=int, default=0, help="Stop after N worker batches (debug)")
     parser.add_argument("--sqd-include-all-blocks", action="store_true", help="Set includeAllBlocks=true (usually increases output size)")
+    parser.add_argument("--sqd-combined", action="store_true",
+                        help="One query per evidence type for all evidence contracts, split locally into per-contract files")
+    parser.add_argument("--sqd-combine-max", type=int, default=100,
+                        help="Max addresses per combined SQD query (default: 100)")
     parser.add_argument("--sqd-with-tx-logs", action="store_true", help="When fetching transactions evidence, also retrieve logs for those txs")
     parser.add_argument("--sqd-with-tx-traces", action="store_true", help="When fetching transactions evidence, also retrieve traces for those txs")
     parser.add_argument("--sqd-with-tx-state-diffs", action="store_true", help="When fetching transactions evidence, also retrieve state diffs for those txs")
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        raise FetchError("--concurrency must be >= 1")
+    if args.concurrency > 1:
+        set_per_host_limit(args.per_host_limit)
+    configure_http_pool(args.pool_size)
+    if args.cache_dir:
+        configure_response_cache(args.cache_dir, args.cache_mode, args.cache_max_mb * 1024 * 1024)
+
     chain_id = str(args.chain_id)
     addresses = load_addresses(args)
 
@@ -356,282 +1308,94 @@ def main():
         "contracts": {}
     }
 
-    queue = [(addr, 0, None) for addr in addresses]
-    visited = set()
-
-    while queue:
-        address, depth, parent = queue.pop(0)
-        address = normalize_address(address)
-        if not address or address in visited:
-            continue
-        visited.add(address)
-
-        contract_dir = os.path.join(out_dir, f"chain-{chain_id}", address)
-        src_dir = os.path.join(contract_dir, "src")
-        abi_dir = os.path.join(contract_dir, "abi")
-        meta_dir = os.path.join(contract_dir, "metadata")
-        rpc_dir = os.path.join(contract_dir, "rpc")
-        ensure_dir(src_dir)
-        ensure_dir(abi_dir)
-        ensure_dir(meta_dir)
-        ensure_dir(rpc_dir)
-
-        info = {
-            "address": address,
-            "chainId": chain_id,
-            "parent": parent,
-            "sources": None,
-            "abi": None,
-            "compiler": None,
-            "verification": {},
-            "proxy": {
-                "isProxy": False,
-                "type": None,
-                "implementations": []
-            },
-            "evidence": {}
-        }
-
-        # Sourcify lookup
-        sourcify_data = None
-        if not args.skip_sourcify:
-            try:
-                sourcify_data = sourcify_contract(args.sourcify_base, chain_id, address, args.sourcify_fields)
-            except FetchError as e:
-                sourcify_data = None
-                info["verification"]["sourcify_error"] = str(e)
-
-        if sourcify_data:
-            write_json(os.path.join(meta_dir, "sourcify-contract.json"), sourcify_data)
-            sources = sourcify_data.get("sources") or {}
-            if sources:
-                write_sources(src_dir, sources)
-                info["sources"] = "sourcify"
-            abi = sourcify_data.get("abi")
-            if abi:
-                write_json(os.path.join(abi_dir, "abi.json"), abi)
-                info["abi"] = "sourcify"
-            info["compiler"] = sourcify_data.get("compilation", {}).get("compilerVersion")
-            info["verification"]["sourcify"] = {
-                "match": sourcify_data.get("match"),
-                "creationMatch": sourcify_data.get("creationMatch"),
-                "runtimeMatch": sourcify_data.get("runtimeMatch"),
-                "verifiedAt": sourcify_data.get("verifiedAt")
-            }
-            proxy_res = sourcify_data.get("proxyResolution") or {}
-            if proxy_res.get("isProxy"):
-                info["proxy"]["isProxy"] = True
-                info["proxy"]["type"] = proxy_res.get("proxyType")
-                impls = []
-                for item in proxy_res.get("implementations", []):
-                    addr = normalize_address(item.get("address", "")) if isinstance(item, dict) else normalize_address(str(item))
-                    if addr:
-                        impls.append(addr)
-                info["proxy"]["implementations"].extend(impls)
-            # Deployment info (when present) is useful for selecting a sensible evidence start block.
-            dep = sourcify_data.get("deployment") or {}
-            if isinstance(dep, dict) and dep.get("blockNumber") is not None:
-                info["verification"]["deploymentBlockNumber"] = dep.get("blockNumber")
-
-        # Etherscan fallback or complement
-        etherscan_item = None
-        if not args.skip_etherscan and (not info["sources"] or not info["abi"]):
-            if not args.etherscan_key:
-                info["verification"]["etherscan_error"] = "Missing Etherscan API key"
-            else:
-                try:
-                    src_resp = etherscan_get(args.etherscan_base, chain_id, address, "getsourcecode", args.etherscan_key)
-                    if src_resp and src_resp.get("status") == "1":
-                        result = src_resp.get("result") or []
-                        if result:
-                            etherscan_item = result[0]
-                            write_json(os.path.join(meta_dir, "etherscan-source.json"), src_resp)
-                            if not info["sources"]:
-                                sources = parse_etherscan_source(etherscan_item.get("SourceCode", ""))
-                                if sources:
-                                    contract_name = etherscan_item.get("ContractName") or "Contract"
-                                    write_sources(src_dir, sources, f"{contract_name}.sol")
-                                    info["sources"] = "etherscan"
-                            info["compiler"] = etherscan_item.get("CompilerVersion") or info["compiler"]
-                            info["verification"]["etherscan"] = {
-                                "contractName": etherscan_item.get("ContractName"),
-                                "compilerVersion": etherscan_item.get("CompilerVersion"),
-                                "optimizationUsed": etherscan_item.get("OptimizationUsed"),
-                                "runs": etherscan_item.get("Runs"),
-                                "licenseType": etherscan_item.get("LicenseType")
-                            }
-                except FetchError as e:
-                    info["verification"]["etherscan_error"] = str(e)
-
-                if not info["abi"]:
-                    try:
-                        abi_resp = etherscan_get(args.etherscan_base, chain_id, address, "getabi", args.etherscan_key)
-                        if abi_resp and abi_resp.get("status") == "1":
-                            abi_raw = abi_resp.get("result")
-                            abi = json.loads(abi_raw) if isinstance(abi_raw, str) else abi_raw
-                            write_json(os.path.join(abi_dir, "abi.json"), abi)
-                            info["abi"] = "etherscan"
-                    except (FetchError, json.JSONDecodeError) as e:
-                        info["verification"]["etherscan_abi_error"] = str(e)
-
-        # Proxy hints from etherscan
-        if etherscan_item:
-            info["proxy"]["implementations"].extend(parse_impls_from_etherscan(etherscan_item))
-            if str(etherscan_item.get("Proxy", "0")).strip() == "1":
-                info["proxy"]["isProxy"] = True
-
-        # RPC proxy detection
-        if not args.skip_rpc and args.rpc_url:
-            slots = {}
-            impl_slot = rpc_call(args.rpc_url, "eth_getStorageAt", [address, EIP1967_IMPLEMENTATION_SLOT, "latest"])
-            slots["implementation"] = impl_slot
-            impl_addr = slot_to_address(impl_slot)
-            if impl_addr:
-                info["proxy"]["isProxy"] = True
-                info["proxy"]["implementations"].append(impl_addr)
-
-            beacon_slot = rpc_call(args.rpc_url, "eth_getStorageAt", [address, EIP1967_BEACON_SLOT, "latest"])
-            slots["beacon"] = beacon_slot
-            beacon_addr = slot_to_address(beacon_slot)
-            if beacon_addr:
-                info["proxy"]["isProxy"] = True
-                slots["beaconAddress"] = beacon_addr
-                impl_call = rpc_call(args.rpc_url, "eth_call", [{"to": beacon_addr, "data": BEACON_IMPL_SELECTOR}, "latest"])
-                slots["beaconImplementationRaw"] = impl_call
-                impl_from_beacon = slot_to_address(impl_call)
-                if impl_from_beacon:
-                    info["proxy"]["implementations"].append(impl_from_beacon)
-
-            write_json(os.path.join(rpc_dir, "slots.json"), slots)
-
-        # Normalize proxy implementations list
-        impls = []
-        for item in info["proxy"]["implementations"]:
-            addr = normalize_address(item)
-            if addr and addr not in impls:
-                impls.append(addr)
-        info["proxy"]["implementations"] = impls
-
-        # SQD evidence extraction (optional)
-        if sqd_gateway and (not args.skip_sqd) and depth <= args.sqd_evidence_depth and sqd_types:
-            sqd_dir = os.path.join(contract_dir, "sqd")
-            sqd_q_dir = os.path.join(sqd_dir, "queries")
-            sqd_r_dir = os.path.join(sqd_dir, "results")
-            ensure_dir(sqd_q_dir)
-            ensure_dir(sqd_r_dir)
-
-            # Determine evidence block range.
-            from_block = args.sqd_from_block
-            if from_block is None:
-                dep_bn = info.get("verification", {}).get("deploymentBlockNumber")
-                try:
-                    from_block = int(dep_bn) if dep_bn is not None and str(dep_bn).isdigit() else None
-                except (TypeError, ValueError):
-                    from_block = None
-            if from_block is None:
-                from_block = 0
-
-            to_block = args.sqd_to_block
-
-            # Minimal field selection for evidence (avoid expensive defaults where possible).
-            fields_min = {
-                "transaction": {"hash": True, "from": True, "to": True, "input": True, "value": True},
-                "log": {"address": True, "topics": True, "data": True, "transactionHash": True},
-            }
-
-            evidence_cfg = {
-                "gateway": sqd_gateway,
-                "types": sqd_types,
-                "fromBlock": from_block,
-                "toBlock": to_block,
-                "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            }
-            write_json(os.path.join(sqd_dir, "config.json"), evidence_cfg)
-
-            outputs = {}
-            for t in sqd_types:
-                if t not in ("logs", "transactions", "traces", "stateDiffs"):
-                    continue
+    chain_dir = os.path.join(out_dir, f"chain-{chain_id}")
+    checkpoint = CrawlCheckpoint(os.path.join(chain_dir, "checkpoint.ndjson"), resume=args.resume)
+    restored = []
+    for address, (key, parent) in checkpoint.nodes.items():
+        info = None
+        if address in checkpoint.done:
+            info = load_info(os.path.join(chain_dir, address))
+        restored.append((address, key, parent, info))
+
+    slot_reader = None
+    code_index = None
+    if not args.skip_rpc and args.rpc_url:
+        complete = {address for address, _, _, info in restored if info is not None}
+        pending_seeds = [a for a in addresses if a not in complete]
+        if args.dedupe_bytecode or not args.skip_bytecode_scan:
+            code_index = CodeIndex(args.rpc_url, batch_size=args.rpc_batch_size)
+            code_index.prefetch(pending_seeds)
+        slot_reader = ProxySlotReader(args.rpc_url, batch_size=args.rpc_batch_size, workers=args.concurrency)
+        probe = pending_seeds
+        if code_index is not None and not args.skip_bytecode_scan:
+            probe = [a for a in pending_seeds if slot_probe_skip_reason(code_index.code(a)) is None]
+        slot_reader.prefetch(probe)
+        if args.dedupe_bytecode:
+            # Completed canonicals keep their role across --resume, then seeds claim in input order.
+            for address, key, parent, info in sorted(restored, key=lambda r: (len(r[1]), r[1])):
+                if info and info.get("codeHash") and not info.get("duplicateOf"):
+                    code_index.claim(info["codeHash"], address)
+            for address in pending_seeds:
+                code_hash = code_index.code_hash(address)
+                if code_hash:
+                    code_index.claim(code_hash, address)
+    elif args.dedupe_bytecode:
+        raise FetchError("--dedupe-bytecode needs --rpc-url (and no --skip-rpc)")
+
+    def fetch(address, parent):
+        return fetch_contract(args, chain_id, out_dir, address, parent, slot_reader=slot_reader, code_index=code_index)
 
-                if t == "logs":
-                    query = {
-                        "fields": fields_min,
-                        "logs": [
-                            {
-                                "address": [address],
-                            }
-                        ],
-                    }
-                elif t == "transactions":
-                    txn_req = {"to": [address]}
-                    if args.sqd_with_tx_logs:
-                        txn_req["logs"] = True
-                    if args.sqd_with_tx_traces:
-                        txn_req["traces"] = True
-                    if args.sqd_with_tx_state_diffs:
-                        txn_req["stateDiffs"] = True
-                    query = {
-                        "fields": fields_min,
-                        "transactions": [txn_req],
-                    }
-                elif t == "traces":
-                    query = {
-                        "traces": [
-                            {
-                                "type": ["call"],
-                                "callTo": [address],
-                                "transaction": True,
-                            }
-                        ],
-                    }
-                else:  # stateDiffs
-                    query = {
-                        "stateDiffs": [
-                            {
-                                "address": [address],
-                                "transaction": True,
-                            }
-                        ],
-                    }
-
-                write_json(os.path.join(sqd_q_dir, f"{t}.json"), query)
-                out_path = os.path.join(sqd_r_dir, f"{t}.ndjson")
-
-                try:
-                    summary = sqd_dump_ndjson(
-                        sqd_gateway,
-                        query,
-                        out_path,
-                        from_block,
-                        to_block=to_block,
-                        include_all_blocks=args.sqd_include_all_blocks,
-                        router_timeout=args.sqd_router_timeout,
-                        worker_timeout=args.sqd_worker_timeout,
-                        sleep_sec=args.sqd_sleep,
-                        max_batches=args.sqd_max_batches,
-                    )
-                    outputs[t] = {"ndjson": os.path.relpath(out_path, contract_dir), "summary": summary}
-                except FetchError as e:
-                    outputs[t] = {"error": str(e)}
-
-            info["evidence"]["sqd"] = {
-                "gateway": sqd_gateway,
-                "fromBlock": from_block,
-                "toBlock": to_block,
-                "types": sqd_types,
-                "outputs": outputs,
-            }
-
-        write_json(os.path.join(contract_dir, "info.json"), info)
-        manifest["contracts"][address] = info
-
-        # Enqueue implementations
-        if info["proxy"]["implementations"] and depth < args.max_depth:
-            for impl in info["proxy"]["implementations"]:
-                if impl not in visited:
-                    queue.append((impl, depth + 1, address))
+    try:
+        crawler = Crawler(fetch, args.max_depth, concurrency=args.concurrency, checkpoint=checkpoint)
+        nodes = crawler.run(addresses, restored=restored)
+
+        evidence = set()
+        if sqd_gateway and (not args.skip_sqd) and sqd_types:
+            evidence = {n.address for n in nodes
+                        if n.depth <= args.sqd_evidence_depth and n.address not in checkpoint.evidence}
+        if evidence and args.sqd_combined:
+            targets = [(os.path.join(chain_dir, n.address), n.info) for n in nodes if n.address in evidence]
+            collect_sqd_evidence_combined(args, sqd_gateway, sqd_types, targets)
+
+        def finalize(node):
+            info = node.info
+            contract_dir = os.path.join(chain_dir, node.address)
+            dirty = node.address in evidence
+            if info["parent"] != node.parent:
+                # Another worker reached this address first via a longer path.
+                info["parent"] = node.parent
+                dirty = True
+            if node.address in evidence and not args.sqd_combined:
+                collect_sqd_evidence(args, sqd_gateway, sqd_types, contract_dir, info)
+            if dirty:
+                write_json(os.path.join(contract_dir, "info.json"), info)
+            if node.address in evidence:
+                checkpoint.evidence_completed(node.address)
+            return info
+
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="evidence") as pool:
+            for node, info in zip(nodes, pool.map(finalize, nodes)):
+                manifest["contracts"][node.address] = info
+
+        # Point clone entries at their canonical bundle.
+        for address, info in manifest["contracts"].items():
+            canonical = manifest["contracts"].get(info.get("duplicateOf"))
+            if canonical is None:
+                continue
+            info["bundle"] = os.path.join(f"chain-{chain_id}", canonical["address"])
+            for field in ("sources", "abi", "compiler"):
+                info[field] = canonical.get(field)
+            if not info["proxy"]["isProxy"] and canonical["proxy"]["type"] in CODE_EMBEDDED_PROXY_TYPES:
+                # Same code, so the same hard-coded target; storage-based proxies are read per address.
+                info["proxy"] = {k: v for k, v in canonical["proxy"].items() if k != "admin"}
+                info["proxy"]["implementations"] = list(canonical["proxy"]["implementations"])
+            write_json(os.path.join(chain_dir, address, "info.json"), info)
+    finally:
+        checkpoint.close()
 
     write_json(os.path.join(out_dir, "manifest.json"), manifest)
+    if RESPONSE_CACHE is not None:
+        print(f"Cache ({RESPONSE_CACHE.mode}): {json.dumps(RESPONSE_CACHE.stats, sort_keys=True)}", file=sys.stderr)
 
 
 if __name__ == "__main__":
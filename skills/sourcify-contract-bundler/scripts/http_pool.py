@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Keep-alive HTTP(S) connection pool with gzip negotiation (stdlib only).
+
+`urllib.request` opens a fresh TCP+TLS connection for every call. The bundler talks
+to the same handful of hosts (Sourcify, Etherscan, the RPC node, SQD router/workers)
+thousands of times, so handshakes dominate. This module keeps idle `http.client`
+connections per (scheme, host, port), asks for `Accept-Encoding: gzip`, and inflates
+bodies incrementally so streamed responses never need to be buffered compressed.
+"""
+
+import http.client
+import socket
+import ssl
+import threading
+import zlib
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+
+# Some gateways sit behind Cloudflare and may block default Python user agents.
+DEFAULT_USER_AGENT = "curl/8.0.0"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+
+# Errors that mean a reused keep-alive connection was closed by the server while idle.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class PoolError(Exception):
+    pass
+
+
+class Response:
+    """Streaming response. `read()` returns decoded (inflated) bytes.
+
+    Closing a fully consumed response hands its connection back to the pool; closing
+    early drops the connection, since leftover body bytes would corrupt the next call.
+    """
+
+    def __init__(self, pool, key, conn, resp, url):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.url = url
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+        self.location = resp.getheader("Location") if resp.status in REDIRECT_CODES else None
+        self._inflate = None
+        if (resp.getheader("Content-Encoding") or "").strip().lower() == "gzip":
+            self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._pending = b""
+        self._eof = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_chunk(self) -> bytes:
+        while not self._eof:
+            try:
+                raw = self._resp.read(CHUNK_SIZE)
+            except (OSError, http.client.HTTPException) as e:
+                raise PoolError(f"Read error for {self.url}: {e}") from e
+            if not raw:
+                self._eof = True
+                if self._inflate is not None:
+                    return self._inflate.flush()
+                return b""
+            if self._inflate is None:
+                return raw
+            try:
+                out = self._inflate.decompress(raw)
+            except zlib.error as e:
+                raise PoolError(f"Corrupt gzip body from {self.url}: {e}") from e
+            if out:
+                return out
+        return b""
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            parts = [self._pending]
+            self._pending = b""
+            while True:
+                chunk = self._next_chunk()
+                if not chunk:
+                    break
+                parts.append(chunk)
+            return b"".join(parts)
+        while len(self._pending) < n:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._pending += chunk
+        out, self._pending = self._pending[:n], self._pending[n:]
+        return out
+
+    def iter_chunks(self):
+        if self._pending:
+            chunk, self._pending = self._pending, b""
+            yield chunk
+        while True:
+            chunk = self._next_chunk()
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        reusable = self._eof and not self._pending and not self._resp.will_close
+        if not reusable:
+            # Drain small remainders so the connection can still be reused.
+            try:
+                if not self._resp.will_close and self._resp.length is not None and self._resp.length <= CHUNK_SIZE:
+                    self._resp.read()
+                    reusable = True
+            except (OSError, http.client.HTTPException):
+                reusable = False
+        self._resp.close()
+        self._pool._release(self._key, conn, reusable)
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive connections, at most `pool_size` idle per host."""
+
+    def __init__(self, pool_size: int = 4, timeout: float = 30, user_agent: str = DEFAULT_USER_AGENT):
+        self.pool_size = max(0, int(pool_size))
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._ssl_context = ssl.create_default_context()
+        self.stats = {"connections": 0, "reused": 0, "requests": 0}
+
+    def _new_conn(self, key, timeout):
+        scheme, host, port = key
+        with self._lock:
+            self.stats["connections"] += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                self.stats["reused"] += 1
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._new_conn(key, timeout), False
+
+    def _release(self, key, conn, reusable):
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.pool_size:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+    @staticmethod
+    def _split(url):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise PoolError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        host_header = parts.netloc.rsplit("@", 1)[-1]
+        return (scheme, parts.hostname, port), path, host_header
+
+    def open(self, method: str, url: str, body: Optional[bytes] = None, headers: Optional[dict] = None,
+             timeout: Optional[float] = None) -> Response:
+        """Send a request and return a streaming `Response` (any status; caller decides)."""
+        timeout = self.timeout if timeout is None else timeout
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._open_once(method, url, body, headers, timeout)
+            if not resp.location:
+                return resp
+            location = urljoin(url, resp.location)
+            resp.close()
+            if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+            url = location
+        raise PoolError(f"Too many redirects for {url}")
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None, headers: Optional[dict] = None,
+                timeout: Optional[float] = None):
+        """Send a request and return `(status, decoded_body_bytes)`."""
+        with self.open(method, url, body=body, headers=headers, timeout=timeout) as resp:
+            return resp.status, resp.read()
+
+    def _open_once(self, method, url, body, headers, timeout):
+        key, path, host_header = self._split(url)
+        hdrs = {
+            "Host": host_header,
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+        }
+        if headers:
+            hdrs.update(headers)
+        with self._lock:
+            self.stats["requests"] += 1
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            try:
+                conn.request(method, path, body=body, headers=hdrs)
+                raw = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server dropped an idle connection; retry once on a fresh one.
+                conn.close()
+                conn = self._new_conn(key, timeout)
+                conn.request(method, path, body=body, headers=hdrs)
+                raw = conn.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if isinstance(e, socket.timeout):
+                raise PoolError(f"Timeout for {url}") from e
+            raise PoolError(f"Connection error for {url}: {e}") from e
+        return Response(self, key, conn, raw, url)
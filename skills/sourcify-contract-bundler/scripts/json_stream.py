@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Split a streamed top-level JSON array into raw element bytes (stdlib only).
+
+SQD workers answer with one JSON array of block objects, often tens of MB. Parsing the
+whole batch and re-serializing every block just to write NDJSON doubles CPU time and
+holds the full batch in memory. `ArraySplitter` instead tracks only bracket depth: a
+compiled regex skips over string literals and plain content in C, so Python code runs
+once per bracket, and each element is handed out as the exact bytes the server sent.
+
+Usage:
+  splitter = ArraySplitter()
+  for chunk in chunks:
+      for raw in splitter.feed(chunk):
+          out.write(raw + b"\\n")
+  splitter.close()
+"""
+
+import json
+import re
+
+# Everything up to the next bracket: plain bytes, or complete string literals. An
+# unterminated string (split across chunks) stops the match at its opening quote.
+_SKIP = re.compile(rb'[^"\[\]{}]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"[^"\[\]{}]*+)*+', re.DOTALL)
+# Scalar elements at depth 0: a complete string literal, or a number/true/false/null.
+_STRING = re.compile(rb'"(?:[^"\\]++|\\.)*+"', re.DOTALL)
+_LITERAL = re.compile(rb'[^,\]\s]++')
+_WS = b" \t\r\n"
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+class ArraySplitter:
+    def __init__(self):
+        self._buf = b""
+        self._pos = 0
+        self._depth = 0
+        self._start = None
+        self._state = "open"  # open -> items -> done
+        self.count = 0
+
+    def feed(self, chunk: bytes):
+        """Consume `chunk`; return the list of elements completed by it."""
+        if self._state == "done":
+            if chunk.strip(_WS):
+                raise JSONStreamError("Trailing data after JSON array")
+            return []
+        self._buf += chunk
+        out = []
+        buf = self._buf
+        pos = self._pos
+        n = len(buf)
+        while pos < n:
+            if self._start is None:
+                c = buf[pos]
+                if c in _WS:
+                    pos += 1
+                    continue
+                if self._state == "open":
+                    if c != 0x5B:  # [
+                        raise JSONStreamError("Response is not a JSON array")
+                    self._state = "items"
+                    pos += 1
+                    continue
+                if c == 0x2C:  # ,
+                    pos += 1
+                    continue
+                if c == 0x5D:  # ]
+                    self._state = "done"
+                    if buf[pos + 1:].strip(_WS):
+                        raise JSONStreamError("Trailing data after JSON array")
+                    pos = n
+                    break
+                if c in (0x7B, 0x5B):  # { [
+                    self._start = pos
+                    self._depth = 1
+                    pos += 1
+                    continue
+                m = (_STRING if c == 0x22 else _LITERAL).match(buf, pos)
+                if m is None or m.end() >= n:
+                    break  # may continue in the next chunk
+                out.append(buf[pos:m.end()])
+                pos = m.end()
+                continue
+
+            pos = _SKIP.match(buf, pos).end()
+            if pos >= n:
+                break
+            c = buf[pos]
+            if c in (0x7B, 0x5B):
+                self._depth += 1
+            elif c in (0x7D, 0x5D):
+                self._depth -= 1
+                if self._depth == 0:
+                    out.append(buf[self._start:pos + 1])
+                    self._start = None
+            else:
+                break  # unterminated string: wait for more bytes
+            pos += 1
+
+        keep = self._start if self._start is not None else pos
+        self._buf = buf[keep:]
+        self._pos = pos - keep
+        if self._start is not None:
+            self._start = 0
+        self.count += len(out)
+        return out
+
+    def close(self):
+        if self._state != "done":
+            raise JSONStreamError("Truncated JSON array")
+
+
+def iter_array_elements(chunks):
+    """Yield the raw bytes of each element of the JSON array streamed as `chunks`."""
+    splitter = ArraySplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    splitter.close()
+
+
+def as_ndjson_line(raw: bytes) -> bytes:
+    """Return `raw` as one NDJSON line; only pretty-printed elements get re-serialized."""
+    if b"\n" in raw or b"\r" in raw:
+        raw = json.dumps(json.loads(raw), separators=(",", ":")).encode("utf-8")
+    return raw + b"\n"
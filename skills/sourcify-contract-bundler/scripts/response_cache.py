@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache for API responses (stdlib only).
+
+Entries are stored as `<cache_dir>/objects/<hh>/<sha256>.json`, where the hash is taken
+over the canonical JSON of the lookup key (endpoint, chain, address, action/fields).
+Each entry records the response class it was stored under; the class decides the TTL.
+The cache is bounded by total size and evicts least-recently-used entries (file mtime
+is bumped on every hit, so the LRU order survives restarts).
+
+Modes:
+- use:     serve fresh entries, fetch + store misses and expired entries
+- refresh: always fetch, overwrite the stored entry
+- offline: serve any stored entry regardless of age, never touch the network
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+CACHE_MODES = ("use", "refresh", "offline")
+
+DAY = 24 * 3600
+# Verified sources are immutable; "not verified" and proxy pointers can change any time.
+DEFAULT_TTLS = {
+    "verified": 90 * DAY,
+    "unverified": 1 * DAY,
+    "proxy": 1 * 3600,
+}
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class CacheMiss(Exception):
+    pass
+
+
+def cache_key_hash(key) -> str:
+    canonical = json.dumps(key, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, cache_dir, mode="use", max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.max_bytes = int(max_bytes)
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._objects = os.path.join(cache_dir, "objects")
+        os.makedirs(self._objects, exist_ok=True)
+        # digest -> [size, last_access]; built once, then maintained incrementally.
+        self._index = {}
+        self._total = 0
+        self._scan()
+
+    def _scan(self):
+        for sub in os.listdir(self._objects):
+            sub_dir = os.path.join(self._objects, sub)
+            if not os.path.isdir(sub_dir):
+                continue
+            for name in os.listdir(sub_dir):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(sub_dir, name))
+                except FileNotFoundError:
+                    continue
+                self._index[name[:-5]] = [st.st_size, st.st_mtime]
+                self._total += st.st_size
+
+    def _path(self, digest):
+        return os.path.join(self._objects, digest[:2], f"{digest}.json")
+
+    def _load(self, digest):
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _touch(self, digest):
+        now = time.time()
+        try:
+            os.utime(self._path(digest), (now, now))
+        except FileNotFoundError:
+            return
+        with self._lock:
+            entry = self._index.get(digest)
+            if entry:
+                entry[1] = now
+
+    def get(self, key):
+        """Return `(hit, value)`; expired entries count as misses outside offline mode."""
+        digest = cache_key_hash(key)
+        if self.mode == "refresh":
+            return False, None
+        entry = self._load(digest)
+        if entry is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return False, None
+        if self.mode != "offline":
+            ttl = self.ttls.get(entry.get("class"), 0)
+            if time.time() - float(entry.get("storedAt", 0)) > ttl:
+                with self._lock:
+                    self.stats["stale"] += 1
+                return False, None
+        self._touch(digest)
+        with self._lock:
+            self.stats["hits"] += 1
+        return True, entry.get("value")
+
+    def put(self, key, value, response_class):
+        if response_class not in self.ttls:
+            raise ValueError(f"Unknown response class: {response_class}")
+        digest = cache_key_hash(key)
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"key": key, "class": response_class, "storedAt": time.time(), "value": value}
+        # Write-then-rename so concurrent readers never see a torn entry.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            old = self._index.get(digest)
+            if old:
+                self._total -= old[0]
+            self._index[digest] = [size, time.time()]
+            self._total += size
+            self.stats["stores"] += 1
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            victims = []
+            for digest, (size, atime) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+                if self._total <= self.max_bytes:
+                    break
+                victims.append(digest)
+                self._total -= size
+                del self._index[digest]
+                self.stats["evictions"] += 1
+        for digest in victims:
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    def fetch(self, key, fetch, classify):
+        """Cache-through lookup.
+
+        `fetch()` runs on a miss; `classify(value)` picks the TTL class, or returns None
+        for responses that must not be stored (rate-limit notices, transient errors).
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+        if self.mode == "offline":
+            raise CacheMiss(f"Offline cache miss for {json.dumps(key, sort_keys=True)}")
+        value = fetch()
+        response_class = classify(value)
+        if response_class is not None:
+            self.put(key, value, response_class)
+        return value
@@ -5,13 +5,21 @@ Implements the router/worker loop described in the official docs:
 https://docs.sqd.ai/subsquid-network/reference/evm-api/
 
 Output is NDJSON (one JSON object per line; each line is a block payload).
+
+With `--parallel N` the block range is split into shards that download concurrently;
+a reorder buffer keeps the NDJSON strictly block-ordered.
 """
 
 import argparse
 import json
+import math
 import os
+import queue
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import Optional
 from urllib.request import Request, urlopen
@@ -104,6 +112,111 @@ def load_query(path: Optional[str], inline: Optional[str]):
     raise SQDError("Provide --query-file or --query")
 
 
+def fetch_batches(gateway: str, query: dict, start: int, end: int, timeout: int = 120, router_timeout: int = 30,
+                  sleep: float = 0.0, first_worker=None, stop: Optional[threading.Event] = None):
+    """Yield worker batches covering [start, end] in block order (router/worker loop).
+
+    `first_worker` may be a prefetched worker URL (or a future resolving to one) for `start`.
+    """
+    current = start
+    worker = first_worker
+    while current <= end:
+        if stop is not None and stop.is_set():
+            return
+        if worker is None:
+            worker = sqd_worker_url(gateway, current, timeout=router_timeout)
+        elif not isinstance(worker, str):
+            worker = worker.result()
+        q = deepcopy(query)
+        q["fromBlock"] = current
+        q["toBlock"] = end
+
+        batch = http_json(worker, method="POST", body=q, timeout=timeout)
+        if not isinstance(batch, list):
+            raise SQDError("Worker response is not a JSON array")
+
+        last = last_block_number(batch)
+        if last < current:
+            raise SQDError(f"Non-advancing batch: last={last} current={current}")
+        yield batch
+        current = last + 1
+        worker = None
+
+        if sleep:
+            time.sleep(sleep)
+
+
+def split_shards(from_block: int, end_block: int, shard_blocks: int):
+    return [(a, min(a + shard_blocks - 1, end_block)) for a in range(from_block, end_block + 1, shard_blocks)]
+
+
+_SHARD_DONE = object()
+
+
+def iter_parallel_batches(gateway: str, query: dict, from_block: int, end_block: int, parallel: int,
+                          shard_blocks: int = 0, timeout: int = 120, router_timeout: int = 30,
+                          sleep: float = 0.0, buffer_batches: int = 4):
+    """Download shards of [from_block, end_block] on `parallel` threads; yield batches in block order.
+
+    Each shard runs its own router/worker loop into a bounded queue. Queues are drained
+    shard by shard (the reorder buffer), so later shards download ahead while earlier ones
+    are written. At most 2 * parallel shards are in flight, each holding at most
+    `buffer_batches` undelivered batches. A shard's first worker URL is resolved as soon as
+    the shard is queued, overlapping router lookups with in-flight worker POSTs.
+    """
+    if shard_blocks <= 0:
+        span = end_block - from_block + 1
+        shard_blocks = max(1, math.ceil(span / (parallel * 8)))
+    shards = iter(split_shards(from_block, end_block, shard_blocks))
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=parallel)
+    router = ThreadPoolExecutor(max_workers=parallel)
+    pending = deque()
+
+    def put(buf, item):
+        while not stop.is_set():
+            try:
+                buf.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def run_shard(start, end, worker_future, buf):
+        try:
+            for batch in fetch_batches(gateway, query, start, end, timeout=timeout, router_timeout=router_timeout,
+                                       sleep=sleep, first_worker=worker_future, stop=stop):
+                put(buf, batch)
+            put(buf, _SHARD_DONE)
+        except Exception as e:
+            put(buf, e)
+
+    def submit_next():
+        shard = next(shards, None)
+        if shard is None:
+            return
+        buf = queue.Queue(maxsize=max(1, buffer_batches))
+        worker_future = router.submit(sqd_worker_url, gateway, shard[0], router_timeout)
+        pool.submit(run_shard, shard[0], shard[1], worker_future, buf)
+        pending.append(buf)
+
+    try:
+        for _ in range(parallel * 2):
+            submit_next()
+        while pending:
+            item = pending[0].get()
+            if item is _SHARD_DONE:
+                pending.popleft()
+                submit_next()
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        router.shutdown(wait=True, cancel_futures=True)
+
+
 def main():
     p = argparse.ArgumentParser(description="Dump EVM data from an SQD Network gateway (NDJSON)")
     p.add_argument("--gateway", required=True, help="Gateway/router URL, e.g. https://v2.archive.subsquid.io/network/ethereum-mainnet")
@@ -116,6 +229,12 @@ def main():
     p.add_argument("--timeout", type=int, default=120, help="Worker POST timeout seconds")
     p.add_argument("--router-timeout", type=int, default=30, help="Router GET timeout seconds")
     p.add_argument("--max-batches", type=int, default=0, help="Stop after N worker batches (debug)")
+    p.add_argument("--parallel", type=int, default=1,
+                   help="Download N block-range shards concurrently (output stays block-ordered)")
+    p.add_argument("--shard-blocks", type=int, default=0,
+                   help="Blocks per shard with --parallel (default: range / (8 * N))")
+    p.add_argument("--buffer-batches", type=int, default=4,
+                   help="Max undelivered batches buffered per in-flight shard with --parallel")
     args = p.parse_args()
 
     gateway = normalize_gateway(args.gateway)
@@ -139,36 +258,28 @@ def main():
 
     os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
 
-    current = from_block
-    batches = 0
-
-    with open(args.out, "w", encoding="utf-8") as out_f:
-        while current <= end_block:
-            worker = sqd_worker_url(gateway, current, timeout=args.router_timeout)
-            q = deepcopy(query)
-            q["fromBlock"] = current
-            q["toBlock"] = end_block
-
-            batch = http_json(worker, method="POST", body=q, timeout=args.timeout)
-            if not isinstance(batch, list):
-                raise SQDError("Worker response is not a JSON array")
-
-            for item in batch:
-                out_f.write(json.dumps(item, separators=(",", ":"), sort_keys=False))
-                out_f.write("\n")
-
-            last = last_block_number(batch)
-            if last < current:
-                raise SQDError(f"Non-advancing batch: last={last} current={current}")
-            current = last + 1
-
-            batches += 1
-            if args.max_batches and batches >= args.max_batches:
-                break
-
-            if args.sleep:
-                time.sleep(args.sleep)
+    if args.parallel > 1:
+        batches = iter_parallel_batches(gateway, query, from_block, end_block, args.parallel,
+                                        shard_blocks=args.shard_blocks, timeout=args.timeout,
+                                        router_timeout=args.router_timeout, sleep=args.sleep,
+                                        buffer_batches=args.buffer_batches)
+    else:
+        batches = fetch_batches(gateway, query, from_block, end_block, timeout=args.timeout,
+                                router_timeout=args.router_timeout, sleep=args.sleep)
 
+    count = 0
+    try:
+        with open(args.out, "w", encoding="utf-8") as out_f:
+            for batch in batches:
+                for item in batch:
+                    out_f.write(json.dumps(item, separators=(",", ":"), sort_keys=False))
+                    out_f.write("\n")
+
+                count += 1
+                if args.max_batches and count >= args.max_batches:
+                    break
+    finally:
+        batches.close()
 
 if __name__ == "__main__":
     try: